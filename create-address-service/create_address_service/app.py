@@ -1,6 +1,8 @@
-from flask import Flask, abort
+from flask import Flask, abort, request
 import structlog
-from monero.wallet import Wallet
+from monero.numbers import to_atomic
+
+from .shards import ShardPool
 
 
 _log = structlog.get_logger(__name__)
@@ -9,50 +11,87 @@ app = Flask(__name__)
 
 app.config.from_envvar('CAS_CONFIG')
 
-MONERO_RPC_HOST = app.config['MONERO_RPC_HOST']
-MONERO_RPC_PORT = app.config['MONERO_RPC_PORT']
-MONERO_RPC_USERNAME = app.config['MONERO_RPC_USERNAME']
-MONERO_RPC_PASSWORD = app.config['MONERO_RPC_PASSWORD']
+MONERO_WALLETS = app.config.get('MONERO_WALLETS') or [{
+    'host': app.config['MONERO_RPC_HOST'],
+    'port': app.config['MONERO_RPC_PORT'],
+    'username': app.config['MONERO_RPC_USERNAME'],
+    'password': app.config['MONERO_RPC_PASSWORD'],
+}]
+"""Wallet RPC accounts that new subaddresses are spread across."""
 
 MONERO_TXN_MAX_HEIGHT = app.config['MONERO_TXN_MAX_HEIGHT']
 
+shards = ShardPool.from_config(MONERO_WALLETS, MONERO_TXN_MAX_HEIGHT)
+
 
 @app.route("/api/addresses", methods = ['POST'])
 def create_address():
-    wallet = get_wallet()
+    key = request.args.get('key')
     _log.info("Creating subaddress")
-    address, _ = wallet.new_address()
-    _log.info("Created subaddress", address=address)
-    return str(address)
+    address, shard = shards.create_address(key.encode() if key else None)
+    return address, {'X-Wallet-Shard': shard.name}
 
 
 @app.route("/api/addresses/<address>", methods = ['GET'])
 def get_address_info(address: str):
     log = _log.bind(address=address)
     log.info("Fetching incoming transactions")
-    
-    wallet = get_wallet()
 
     try:
-        incoming_payments = wallet.incoming(
-            local_address=address,
-            max_height=MONERO_TXN_MAX_HEIGHT,
-            confirmed=True,
-        )
+        incoming_payments = shards.incoming(address, request.args.get('shard'))
     except ValueError:
+        incoming_payments = None
+
+    if incoming_payments is None:
         log.warn("Address does not exist")
         return abort(404)
 
+    return summarize_payments(log, incoming_payments)
+
+
+@app.route("/api/addresses/lookup", methods = ['POST'])
+def lookup_addresses():
+    entries = (request.get_json(silent=True) or {}).get('addresses')
+    if not isinstance(entries, list):
+        return abort(400)
+
+    # Entries are either an address or {"address": ..., "shard": ...}, where
+    # a null shard means the same as leaving it out.
+    addresses = []
+    shard_names = {}
+    for entry in entries:
+        shard_name = None
+        if isinstance(entry, dict):
+            shard_name = entry.get('shard')
+            entry = entry.get('address')
+        if not isinstance(entry, str):
+            return abort(400)
+        if shard_name is not None:
+            if not isinstance(shard_name, str):
+                return abort(400)
+            shard_names[entry] = shard_name
+        addresses.append(entry)
+
+    _log.info("Fetching incoming transactions", n_addresses=len(addresses))
+    payments = shards.incoming_many(addresses, shard_names)
+
+    return {
+        address: summarize_payments(_log.bind(address=address), incoming)
+        for address, incoming in payments.items()
+    }
+
+
+def summarize_payments(log, incoming_payments):
     total_received = sum((p.amount for p in incoming_payments))
 
     # Use last transaction as the source of information
     txn_hash = (
-        incoming_payments[-1].hash
+        incoming_payments[-1].transaction.hash
         if len(incoming_payments) > 0
         else None
     )
 
-    _log.info(
+    log.info(
         "Received transaction info",
         n_payments=len(incoming_payments),
         xmr_received=total_received,
@@ -61,14 +100,5 @@ def get_address_info(address: str):
     return {
         'transaction': txn_hash,
         'total_xmr': total_received,
+        'total_piconero': to_atomic(total_received),
     }
-
-
-def get_wallet():
-    return Wallet(
-        host = MONERO_RPC_HOST,
-        port = MONERO_RPC_PORT,
-        user = MONERO_RPC_USERNAME,
-        password = MONERO_RPC_PASSWORD,
-    )
-
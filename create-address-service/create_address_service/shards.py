@@ -0,0 +1,308 @@
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+import secrets
+import time
+from typing import Iterable, Optional
+
+import structlog
+from monero.account import Account
+from monero.address import address as parse_address
+from monero.backends.jsonrpc import JSONRPCWallet
+from monero.exceptions import WrongAddress
+from monero.transaction import IncomingPayment
+
+
+_log = structlog.get_logger(__name__)
+
+BULK_LOOKUP_SIZE = 50
+"""
+Above this many addresses, a shard lists all subaddresses of its account once
+instead of asking about each address. Listing costs a download of the whole
+account, so it only pays off for large batches.
+"""
+
+
+class WalletShard:
+    """
+    One account in one monero-wallet-rpc instance that subaddresses can be
+    allocated in.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        account: int = 0,
+        name: Optional[str] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.account = account
+        self.name = name or f'{host}:{port}/{account}'
+        """
+        Stable name that callers store next to an address and pass back on
+        lookups. Set it explicitly if the host or port may change.
+        """
+
+    def __repr__(self):
+        return f'WalletShard({self.name})'
+
+    def get_backend(self) -> JSONRPCWallet:
+        # A fresh backend per call, because the underlying requests session
+        # is not safe to share between the threads that fan out lookups.
+        return JSONRPCWallet(
+            host = self.host,
+            port = self.port,
+            user = self.username,
+            password = self.password,
+        )
+
+    def get_account(self) -> Account:
+        return Account(self.get_backend(), self.account)
+
+    def new_address(self) -> str:
+        address, _ = self.get_account().new_address()
+        return str(address)
+
+    def owned(self, addresses: list[str]) -> list[str]:
+        """Returns the addresses that belong to this shard's account."""
+        backend = self.get_backend()
+
+        if len(addresses) > BULK_LOOKUP_SIZE:
+            listed = backend.raw_request(
+                'get_address',
+                {'account_index': self.account},
+            )
+            account_addresses = {a['address'] for a in listed['addresses']}
+            return [a for a in addresses if a in account_addresses]
+
+        result = []
+        for address in addresses:
+            try:
+                index = backend.raw_request(
+                    'get_address_index',
+                    {'address': address},
+                    squelch_error_logging=True,
+                )['index']
+            except WrongAddress:
+                continue
+            if index['major'] == self.account:
+                result.append(address)
+        return result
+
+    def incoming(
+        self,
+        addresses: list[str],
+        max_height: int,
+    ) -> list[IncomingPayment]:
+        # The wallet RPC returns every transfer of the account and filters
+        # locally, so asking for many addresses at once costs one round trip.
+        return self.get_account().incoming(
+            local_address=addresses,
+            max_height=max_height,
+            confirmed=True,
+        )
+
+
+class ShardPool:
+    """
+    Spreads subaddresses over several wallet shards.
+
+    New subaddresses are placed by hashing a key, which is random unless the
+    caller supplies one. The name of the chosen shard is handed back to the
+    caller, who passes it again on lookups so they go straight to that shard.
+    Lookups without a known shard name fall back to asking every shard in
+    parallel. Owners are remembered, and so are addresses that no shard owns,
+    for miss_ttl seconds. Either way, shards can be added without moving any
+    existing subaddress.
+    """
+
+    def __init__(
+        self,
+        shards: list[WalletShard],
+        max_height: int,
+        max_cached_owners: int = 100_000,
+        max_cached_misses: int = 10_000,
+        miss_ttl: float = 60.0,
+    ):
+        if not shards:
+            raise ValueError("At least one wallet shard must be configured")
+
+        self.shards = shards
+        self.max_height = max_height
+        self.max_cached_owners = max_cached_owners
+        self.max_cached_misses = max_cached_misses
+        self.miss_ttl = miss_ttl
+
+        self._by_name = {shard.name: shard for shard in shards}
+        if len(self._by_name) != len(shards):
+            raise ValueError("Wallet shard names must be unique")
+
+        self._owners: dict[str, WalletShard] = {}
+        # Address -> time.monotonic() after which it is asked about again.
+        # Misses expire because another instance may create the address.
+        self._misses: dict[str, float] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(shards),
+            thread_name_prefix='wallet-shard',
+        )
+
+    @staticmethod
+    def from_config(wallets: list[dict], max_height: int) -> 'ShardPool':
+        return ShardPool(
+            [WalletShard(**wallet) for wallet in wallets],
+            max_height=max_height,
+        )
+
+    def shard_for_key(self, key: bytes) -> WalletShard:
+        digest = sha256(key).digest()
+        return self.shards[int.from_bytes(digest[:8], 'big') % len(self.shards)]
+
+    def shard_named(self, name: str) -> WalletShard:
+        """Raises KeyError if no shard has this name."""
+        return self._by_name[name]
+
+    def create_address(
+        self,
+        key: Optional[bytes] = None,
+    ) -> tuple[str, WalletShard]:
+        shard = self.shard_for_key(key or secrets.token_bytes(16))
+        address = shard.new_address()
+        self._remember(address, shard)
+        _log.info("Created subaddress", address=address, shard=shard.name)
+        return address, shard
+
+    def owner(
+        self,
+        address: str,
+        shard_name: Optional[str] = None,
+    ) -> Optional[WalletShard]:
+        """
+        Returns the shard that owns the address, or None if no shard does.
+        If the shard name from create_address is given and still configured,
+        it is trusted. Otherwise the owner is looked up.
+
+        Raises ValueError if the address is malformed.
+        """
+        parse_address(address)
+        shard = self._shard_hint(shard_name)
+        if shard is not None:
+            return shard
+        return self._resolve_owners([address]).get(address)
+
+    def incoming(
+        self,
+        address: str,
+        shard_name: Optional[str] = None,
+    ) -> Optional[list[IncomingPayment]]:
+        """
+        Returns the confirmed payments to one address, or None if no shard owns
+        it.
+
+        Raises ValueError if the address is malformed.
+        """
+        shard = self.owner(address, shard_name)
+        if shard is None:
+            return None
+        return shard.incoming([address], self.max_height)
+
+    def incoming_many(
+        self,
+        addresses: Iterable[str],
+        shard_names: Optional[dict[str, str]] = None,
+    ) -> dict[str, list[IncomingPayment]]:
+        """
+        Returns the confirmed payments to each address, querying every
+        involved shard once and in parallel. shard_names maps addresses to the
+        shard names returned by create_address, for the addresses where the
+        caller knows them.
+
+        Malformed addresses and addresses that no shard owns are left out of
+        the result.
+        """
+        shard_names = shard_names or {}
+
+        by_shard: dict[WalletShard, list[str]] = {}
+        unknown = []
+        for address in addresses:
+            try:
+                parse_address(address)
+            except ValueError:
+                continue
+            shard = self._shard_hint(shard_names.get(address))
+            if shard is not None:
+                by_shard.setdefault(shard, []).append(address)
+            else:
+                unknown.append(address)
+
+        for address, shard in self._resolve_owners(unknown).items():
+            by_shard.setdefault(shard, []).append(address)
+
+        results: dict[str, list[IncomingPayment]] = {
+            address: []
+            for owned in by_shard.values()
+            for address in owned
+        }
+        payments = self._executor.map(
+            lambda item: item[0].incoming(item[1], self.max_height),
+            by_shard.items(),
+        )
+        for shard_payments in payments:
+            for payment in shard_payments:
+                results[str(payment.local_address)].append(payment)
+
+        return results
+
+    def _shard_hint(self, shard_name: Optional[str]) -> Optional[WalletShard]:
+        # Shard names are only hints: a stored default name goes stale when
+        # the host, port or account of a shard changes.
+        if shard_name is None:
+            return None
+        shard = self._by_name.get(shard_name)
+        if shard is None:
+            _log.warn("Unknown wallet shard, looking up owner", shard=shard_name)
+        return shard
+
+    def _resolve_owners(self, addresses: list[str]) -> dict[str, WalletShard]:
+        # Fallback for callers that did not keep the shard name: every shard
+        # is asked in parallel.
+        now = time.monotonic()
+        owners = {}
+        unknown = []
+        for address in addresses:
+            shard = self._owners.get(address)
+            if shard is not None:
+                owners[address] = shard
+            elif self._misses.get(address, 0) <= now:
+                unknown.append(address)
+
+        if unknown:
+            owned = self._executor.map(
+                lambda shard: shard.owned(unknown),
+                self.shards,
+            )
+            for shard, shard_addresses in zip(self.shards, owned):
+                for address in shard_addresses:
+                    self._remember(address, shard)
+                    owners[address] = shard
+            for address in unknown:
+                if address not in owners:
+                    self._remember_miss(address, now + self.miss_ttl)
+
+        return owners
+
+    def _remember(self, address: str, shard: WalletShard) -> None:
+        if len(self._owners) >= self.max_cached_owners:
+            self._owners.pop(next(iter(self._owners)), None)
+        self._owners[address] = shard
+        self._misses.pop(address, None)
+
+    def _remember_miss(self, address: str, expires: float) -> None:
+        self._misses.pop(address, None)
+        if len(self._misses) >= self.max_cached_misses:
+            self._misses.pop(next(iter(self._misses)), None)
+        self._misses[address] = expires
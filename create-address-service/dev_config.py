@@ -5,3 +5,10 @@ MONERO_RPC_PASSWORD = 'password'
 
 MONERO_TXN_MAX_HEIGHT = 1000000
 
+
+# To spread subaddresses over several wallet RPC instances or accounts, list
+# them here instead. The MONERO_RPC_* settings are ignored when this is set.
+# MONERO_WALLETS = [
+#     {'host': 'localhost', 'port': 48081, 'username': 'monero', 'password': 'password', 'account': 0},
+#     {'host': 'localhost', 'port': 48081, 'username': 'monero', 'password': 'password', 'account': 1},
+# ]
@@ -0,0 +1,8 @@
+import os
+from pathlib import Path
+
+
+os.environ.setdefault(
+    'CAS_CONFIG',
+    str(Path(__file__).resolve().parent.parent / 'dev_config.py'),
+)
@@ -0,0 +1,313 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import importlib
+import json
+import os
+import threading
+
+import pytest
+from monero import base58
+from monero.keccak import keccak_256
+
+from create_address_service import shards
+from create_address_service.shards import ShardPool, WalletShard
+
+
+TESTNET_SUBADDR_NETBYTE = 63
+
+
+def random_subaddress() -> str:
+    data = bytes([TESTNET_SUBADDR_NETBYTE]) + os.urandom(64)
+    data += keccak_256(data).digest()[:4]
+    return base58.encode(data.hex())
+
+
+class FakeWalletRPC:
+    """
+    A monero-wallet-rpc stand-in that implements just enough JSON RPC methods
+    for subaddress creation and lookup.
+    """
+
+    def __init__(self):
+        self.addresses: dict[str, tuple[int, int]] = {}
+        self.transfers: list[dict] = []
+        self.calls: list[str] = []
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                fake.calls.append(body['method'])
+                response = getattr(fake, body['method'])(body['params'])
+                data = json.dumps({'jsonrpc': '2.0', 'id': 0, **response}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *_):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def shard(self, account: int = 0) -> WalletShard:
+        return WalletShard('127.0.0.1', self.port, 'monero', 'password', account)
+
+    def pay(self, address: str, atomic: int, txid: str, height: int = 10):
+        self.transfers.append({
+            'address': address,
+            'amount': atomic,
+            'txid': txid,
+            'height': height,
+            'subaddr_index': dict(zip(('major', 'minor'), self.addresses[address])),
+        })
+
+    def create_address(self, params):
+        account = params['account_index']
+        minor = 1 + sum(1 for a, _ in self.addresses.values() if a == account)
+        address = random_subaddress()
+        self.addresses[address] = (account, minor)
+        return {'result': {'address': address, 'address_index': minor}}
+
+    def get_address_index(self, params):
+        if params['address'] not in self.addresses:
+            return {'error': {'code': -2, 'message': "Address doesn't belong to the wallet"}}
+        major, minor = self.addresses[params['address']]
+        return {'result': {'index': {'major': major, 'minor': minor}}}
+
+    def get_address(self, params):
+        return {'result': {'addresses': [
+            {'address': address, 'address_index': minor}
+            for address, (major, minor) in self.addresses.items()
+            if major == params['account_index']
+        ]}}
+
+    def get_transfers(self, params):
+        return {'result': {'in': [
+            t for t in self.transfers
+            if t['subaddr_index']['major'] == params['account_index']
+        ]}}
+
+
+@pytest.fixture
+def rpcs():
+    fakes = [FakeWalletRPC(), FakeWalletRPC()]
+    yield fakes
+    for fake in fakes:
+        fake.server.shutdown()
+
+
+@pytest.fixture
+def pool(rpcs):
+    return ShardPool(
+        [rpcs[0].shard(0), rpcs[0].shard(1), rpcs[1].shard(0)],
+        max_height=1000,
+    )
+
+
+def test_create_address_spreads_across_shards(rpcs, pool):
+    for i in range(30):
+        pool.create_address(str(i).encode())
+
+    accounts = [a for a, _ in rpcs[0].addresses.values()]
+    assert accounts.count(0) > 0
+    assert accounts.count(1) > 0
+    assert len(rpcs[1].addresses) > 0
+
+
+def test_create_address_with_same_key_uses_same_shard(pool):
+    assert pool.shard_for_key(b'order-1') is pool.shard_for_key(b'order-1')
+
+
+def fake_for(rpcs, shard):
+    return rpcs[0] if shard.port == rpcs[0].port else rpcs[1]
+
+
+def test_incoming_with_shard_name_goes_straight_to_owner(rpcs, pool):
+    address, owner = pool.create_address(b'x')
+    fake_for(rpcs, owner).pay(address, 1_500_000_000_000, 'a' * 64)
+    for fake in rpcs:
+        fake.calls.clear()
+
+    fresh = ShardPool(pool.shards, max_height=1000)
+    payments = fresh.incoming(address, owner.name)
+
+    assert [str(p.amount) for p in payments] == ['1.500000000000']
+    assert sorted(rpcs[0].calls + rpcs[1].calls) == ['get_transfers']
+
+
+def test_incoming_discovers_owner(rpcs, pool):
+    address, owner = pool.create_address(b'x')
+    fake_for(rpcs, owner).pay(address, 1_500_000_000_000, 'a' * 64)
+
+    # A fresh pool has to discover the owner by asking every shard.
+    fresh = ShardPool(pool.shards, max_height=1000)
+    payments = fresh.incoming(address)
+
+    assert [str(p.amount) for p in payments] == ['1.500000000000']
+    assert fresh.owner(address) is owner
+
+
+def test_incoming_unknown_shard_name_falls_back_to_lookup(rpcs, pool):
+    address, owner = pool.create_address(b'x')
+    fake_for(rpcs, owner).pay(address, 1_500_000_000_000, 'a' * 64)
+
+    fresh = ShardPool(pool.shards, max_height=1000)
+    payments = fresh.incoming(address, 'renamed')
+
+    assert [str(p.amount) for p in payments] == ['1.500000000000']
+    assert fresh.owner(address) is owner
+
+
+def test_incoming_unknown_address(pool):
+    assert pool.incoming(random_subaddress()) is None
+
+
+def test_incoming_unknown_address_is_cached(rpcs, pool):
+    address = random_subaddress()
+    assert pool.incoming(address) is None
+    for fake in rpcs:
+        fake.calls.clear()
+
+    assert pool.incoming(address) is None
+    assert rpcs[0].calls + rpcs[1].calls == []
+
+    pool.miss_ttl = 0
+    pool._misses.clear()
+    assert pool.incoming(address) is None
+    assert pool.incoming(address) is None
+    assert len(rpcs[0].calls + rpcs[1].calls) == 6
+
+
+def test_unknown_address_cache_is_bounded(pool):
+    pool.max_cached_misses = 3
+    for _ in range(5):
+        pool.incoming(random_subaddress())
+    assert len(pool._misses) == 3
+
+
+def test_incoming_malformed_address(pool):
+    with pytest.raises(ValueError):
+        pool.incoming('not-an-address')
+
+
+def pay_each(rpcs, pool, n):
+    addresses = [pool.create_address(str(i).encode())[0] for i in range(n)]
+    for i, address in enumerate(addresses):
+        fake = rpcs[0] if address in rpcs[0].addresses else rpcs[1]
+        fake.pay(address, 1_000_000_000_000 * (i + 1), f'{i:064x}')
+    for fake in rpcs:
+        fake.calls.clear()
+    return addresses
+
+
+def test_incoming_many_queries_each_shard_once(rpcs, pool):
+    addresses = pay_each(rpcs, pool, 12)
+
+    # A cold pool asks every shard about each address it does not know.
+    fresh = ShardPool(pool.shards, max_height=1000)
+    unknown = random_subaddress()
+    results = fresh.incoming_many(addresses + [unknown, 'garbage'])
+
+    assert set(results) == set(addresses)
+    for i, address in enumerate(addresses):
+        assert [p.transaction.hash for p in results[address]] == [f'{i:064x}']
+    assert sorted(set(rpcs[0].calls + rpcs[1].calls)) == [
+        'get_address_index',
+        'get_transfers',
+    ]
+    assert rpcs[0].calls.count('get_transfers') == 2
+    assert rpcs[1].calls.count('get_transfers') == 1
+
+
+def test_incoming_many_lists_accounts_for_large_batches(monkeypatch, rpcs, pool):
+    monkeypatch.setattr(shards, 'BULK_LOOKUP_SIZE', 4)
+    addresses = pay_each(rpcs, pool, 12)
+
+    fresh = ShardPool(pool.shards, max_height=1000)
+    results = fresh.incoming_many(addresses + [random_subaddress()])
+
+    assert set(results) == set(addresses)
+    assert sorted(rpcs[0].calls) == ['get_address'] * 2 + ['get_transfers'] * 2
+    assert sorted(rpcs[1].calls) == ['get_address', 'get_transfers']
+
+
+@pytest.fixture
+def client(monkeypatch, pool):
+    app_module = importlib.import_module('create_address_service.app')
+    monkeypatch.setattr(app_module, 'shards', pool)
+    return app_module.app.test_client()
+
+
+def test_create_address_returns_shard(rpcs, client, pool):
+    response = client.post('/api/addresses')
+
+    assert response.status_code == 200
+    shard = pool.shard_named(response.headers['X-Wallet-Shard'])
+    assert response.text in fake_for(rpcs, shard).addresses
+
+
+def test_get_address_info(rpcs, client, pool):
+    address, shard = pool.create_address(b'x')
+    fake_for(rpcs, shard).pay(address, 1_500_000_000_000, 'a' * 64)
+
+    response = client.get(f'/api/addresses/{address}?shard={shard.name}')
+
+    assert response.status_code == 200
+    assert response.json['transaction'] == 'a' * 64
+    assert response.json['total_piconero'] == 1_500_000_000_000
+
+
+@pytest.mark.parametrize('address', ['garbage', random_subaddress()])
+def test_get_address_info_not_found(client, address):
+    assert client.get(f'/api/addresses/{address}').status_code == 404
+
+
+def test_get_address_info_unknown_shard(rpcs, client, pool):
+    address, shard = pool.create_address(b'x')
+    fake_for(rpcs, shard).pay(address, 1_500_000_000_000, 'a' * 64)
+
+    response = client.get(f'/api/addresses/{address}?shard=renamed')
+
+    assert response.status_code == 200
+    assert response.json['transaction'] == 'a' * 64
+
+
+def test_lookup_addresses(rpcs, client, pool):
+    (paid, paid_shard), (unpaid, _) = [
+        pool.create_address(key) for key in (b'a', b'b')
+    ]
+    fake_for(rpcs, paid_shard).pay(paid, 2_000_000_000_000, 'c' * 64)
+
+    response = client.post('/api/addresses/lookup', json={'addresses': [
+        {'address': paid, 'shard': paid_shard.name},
+        {'address': unpaid, 'shard': None},
+        random_subaddress(),
+    ]})
+
+    assert response.status_code == 200
+    assert response.json == {
+        paid: {
+            'transaction': 'c' * 64,
+            'total_xmr': '2.000000000000',
+            'total_piconero': 2_000_000_000_000,
+        },
+        unpaid: {
+            'transaction': None,
+            'total_xmr': 0,
+            'total_piconero': 0,
+        },
+    }
+
+
+@pytest.mark.parametrize('body', [
+    {},
+    {'addresses': 'x'},
+    {'addresses': [1]},
+    {'addresses': [{'address': random_subaddress(), 'shard': ['a']}]},
+])
+def test_lookup_addresses_bad_request(client, body):
+    assert client.post('/api/addresses/lookup', json=body).status_code == 400
@@ -0,0 +1,169 @@
+"""
+Opt-in profiling for requests and management commands.
+
+Profiles are written with cProfile as .pstats files into PROFILING_DIR, which
+can be read with pstats, snakeviz, or turned into a flamegraph with flameprof.
+A request is profiled if it carries a valid X-Profile header (see the
+profile_token command) or is picked at random with PROFILING_SAMPLE_RATE.
+
+Independently of that, every SQL statement slower than PROFILING_SLOW_QUERY_MS
+is logged along with the lines of project code that issued it.
+"""
+
+import cProfile
+import logging
+import random
+import re
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.core import signing
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SALT = 'gtf_order_api.profiling'
+TOKEN_VALUE = 'profile'
+
+STACK_DEPTH = 5
+"""How many frames of project code to log for a slow query."""
+
+
+def make_token() -> str:
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(TOKEN_VALUE)
+
+
+def is_valid_token(token: str) -> bool:
+    try:
+        value = signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token,
+            max_age=settings.PROFILING_TOKEN_MAX_AGE,
+        )
+    except signing.BadSignature:
+        return False
+    return value == TOKEN_VALUE
+
+
+@contextmanager
+def profile(name: str) -> Iterator[None]:
+    """Profiles the block and writes the result to PROFILING_DIR."""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already running, e.g. for a concurrent request.
+        logger.warning("Not profiling %s: profiler already active", name)
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+
+        out_dir = Path(settings.PROFILING_DIR)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', name).strip('-')
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        path = out_dir / f'{stamp}-{slug}.pstats'
+        profiler.dump_stats(path)
+        logger.info("Wrote profile of %s to %s", name, path)
+
+
+@contextmanager
+def log_slow_queries() -> Iterator[None]:
+    """
+    Logs SQL statements in the block that take longer than
+    PROFILING_SLOW_QUERY_MS. Does nothing if that is None.
+    """
+    threshold_ms = settings.PROFILING_SLOW_QUERY_MS
+    if threshold_ms is None:
+        yield
+        return
+
+    def wrapper(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if duration_ms >= threshold_ms:
+                logger.warning(
+                    "Slow query (%.1f ms): %s\n%s",
+                    duration_ms,
+                    sql,
+                    ''.join(_project_stack()),
+                )
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+def _project_stack() -> list[str]:
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and frame.filename != __file__
+        and 'site-packages' not in frame.filename
+    ]
+    return traceback.format_list(frames[-STACK_DEPTH:])
+
+
+class ProfilingMiddleware:
+    """Profiles sampled or explicitly requested requests."""
+
+    header = 'HTTP_X_PROFILE'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with ExitStack() as stack:
+            stack.enter_context(log_slow_queries())
+            if self.should_profile(request):
+                stack.enter_context(
+                    profile(f'{request.method} {request.path}')
+                )
+            return self.get_response(request)
+
+    def should_profile(self, request: HttpRequest) -> bool:
+        token: Optional[str] = request.META.get(self.header)
+        if token is not None:
+            return is_valid_token(token)
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+class ProfiledCommand(BaseCommand):
+    """
+    A management command that logs slow queries and can be profiled with
+    --profile.
+    """
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        parser.add_argument(
+            '--profile',
+            action='store_true',
+            help='Write a cProfile of this run to PROFILING_DIR.',
+        )
+        return parser
+
+    def execute(self, *args, **options):
+        with ExitStack() as stack:
+            stack.enter_context(log_slow_queries())
+            if options.pop('profile', False):
+                name = self.__module__.rsplit('.', 1)[-1]
+                stack.enter_context(profile(f'command {name}'))
+            return super().execute(*args, **options)
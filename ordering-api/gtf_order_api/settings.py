@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'gtf_order_api.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -130,3 +131,17 @@ STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+
+# Profiling, see gtf_order_api/profiling.py
+
+PROFILING_DIR = BASE_DIR / 'profiles'
+
+PROFILING_SAMPLE_RATE = 0.0
+"""Fraction of requests to profile without an X-Profile header."""
+
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+"""Seconds that a token from the profile_token command stays valid."""
+
+PROFILING_SLOW_QUERY_MS = None
+"""Log SQL statements slower than this. None disables the slow query log."""
+
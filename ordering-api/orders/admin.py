@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 from .models import *
 
 admin.site.register(Order)
@@ -7,3 +9,52 @@ admin.site.register(StoreItem)
 admin.site.register(Supplier)
 admin.site.register(XMRExchangeRate)
 
+
+MAX_PK = 2 ** 63 - 1
+"""The largest value a BigIntegerField primary key can hold."""
+
+
+class CappedCountPaginator(Paginator):
+    """
+    Counts at most max_count rows, so that listing the archive never counts
+    the whole table. Pages past the cap cannot be reached.
+    """
+
+    max_count = 10_000
+
+    @cached_property
+    def count(self) -> int:
+        return len(self.object_list.values_list('pk', flat=True)[:self.max_count])
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    """Read-only view of archived orders, searchable by exact id or email."""
+
+    list_display = ['id', 'email', 'state', 'date_placed', 'date_archived']
+    # Only shows the search box, see get_search_results.
+    search_fields = ['id', 'email']
+    show_full_result_count = False
+    paginator = CappedCountPaginator
+
+    def get_search_results(self, request, queryset, search_term):
+        # The admin's "=field" search is iexact, which neither the primary key
+        # nor the email index can serve. Exact lookups can.
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.isascii() and search_term.isdigit():
+            pk = int(search_term)
+            if pk > MAX_PK:
+                return queryset.none(), False
+            return queryset.filter(pk=pk), False
+        return queryset.filter(email=search_term), False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
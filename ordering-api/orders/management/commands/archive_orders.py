@@ -0,0 +1,73 @@
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from gtf_order_api.profiling import ProfiledCommand
+from orders.models import ArchivedOrder, Order
+
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = [Order.State.COMPLETED, Order.State.LOST]
+
+
+class Command(ProfiledCommand):
+    help = 'Moves old COMPLETED and LOST orders into the order archive.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Archive orders placed more than this many days ago.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Orders moved per transaction.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the orders that would be archived.',
+        )
+
+    def handle(self, *_, days, chunk_size, dry_run, **__):
+        cutoff = timezone.now() - timedelta(days=days)
+        orders = Order.objects.filter(
+            state__in=TERMINAL_STATES,
+            date_placed__lt=cutoff,
+        )
+        self.stdout.write(f"cutoff: {cutoff}")
+
+        if dry_run:
+            self.stdout.write(f"to_archive: {orders.count()}")
+            return
+
+        # Found once with the (state, date_placed) index, then archived in
+        # pk-ordered batches.
+        pks = list(orders.order_by('pk').values_list('pk', flat=True))
+        self.stdout.write(f"to_archive: {len(pks)}")
+
+        n_archived = 0
+        for start in range(0, len(pks), chunk_size):
+            with transaction.atomic():
+                chunk = list(
+                    orders
+                    .filter(pk__in=pks[start:start + chunk_size])
+                    .prefetch_related('items__item')
+                )
+                if not chunk:
+                    continue
+
+                ArchivedOrder.objects.bulk_create(
+                    [ArchivedOrder.from_order(order) for order in chunk]
+                )
+                Order.objects.filter(pk__in=[o.pk for o in chunk]).delete()
+
+            n_archived += len(chunk)
+            self.stderr.write(f"Archived {n_archived} orders")
+
+        self.stdout.write(f"archived: {n_archived}")
@@ -0,0 +1,245 @@
+import csv
+import itertools
+import json
+import logging
+import sys
+import time
+from contextlib import nullcontext
+from decimal import Decimal
+from typing import Iterable, Iterator
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import CommandError
+from django.db import transaction
+from gtf_order_api.profiling import ProfiledCommand
+from orders import money
+from orders.models import StoreItem, Supplier
+
+
+logger = logging.getLogger(__name__)
+
+ROW_ERRORS = (
+    KeyError,
+    TypeError,
+    ValueError,
+    ArithmeticError,
+    ValidationError,
+)
+"""Errors that make a row be skipped instead of aborting the import."""
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', ''}
+
+
+class Command(ProfiledCommand):
+    help = 'Upserts store items or suppliers from a CSV or NDJSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='File to import, or - to read from stdin.',
+        )
+        parser.add_argument(
+            '--model',
+            choices=['items', 'suppliers'],
+            default='items',
+            help='What the rows describe. Defaults to items.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'ndjson'],
+            help='Input format. Guessed from the file extension if omitted.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Rows upserted per transaction.',
+        )
+
+    def handle(self, *_, path, model, format, chunk_size, **__):
+        format = format or guess_format(path)
+
+        if model == 'items':
+            importer = StoreItemImporter()
+        else:
+            importer = SupplierImporter()
+
+        started = time.monotonic()
+        n_rows = 0
+        n_skipped = 0
+
+        with open_input(path) as f:
+            rows = enumerate(read_rows(f, format), start=1)
+            while chunk := list(itertools.islice(rows, chunk_size)):
+                # Keyed by title, so that only the last row for a title is
+                # upserted: a conflict cannot be updated twice in one query.
+                objs = {}
+                for line, raw in chunk:
+                    try:
+                        obj = importer.build(parse_row(raw, format))
+                    except ROW_ERRORS as e:
+                        self.stderr.write(f"Skipping row {line}: {e!r}")
+                        n_skipped += 1
+                        continue
+                    objs.pop(obj.title, None)
+                    objs[obj.title] = (line, obj)
+
+                with transaction.atomic():
+                    skipped = importer.upsert(list(objs.values()))
+
+                for line, reason in skipped:
+                    self.stderr.write(f"Skipping row {line}: {reason}")
+                n_rows += len(objs) - len(skipped)
+                n_skipped += len(skipped)
+                elapsed = time.monotonic() - started
+                self.stderr.write(
+                    f"Imported {n_rows} rows ({n_rows / elapsed:.0f} rows/s)"
+                )
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(f"imported: {n_rows}")
+        self.stdout.write(f"skipped: {n_skipped}")
+        self.stdout.write(f"seconds: {elapsed:.2f}")
+        self.stdout.write(f"rows_per_second: {n_rows / elapsed:.0f}")
+
+
+class SupplierImporter:
+    def build(self, row: dict) -> Supplier:
+        obj = Supplier(title=row['title'], url=row['url'])
+        obj.clean_fields()
+        return obj
+
+    def upsert(self, rows: list[tuple[int, Supplier]]) -> list[tuple[int, str]]:
+        """Upserts (line, supplier) pairs. Returns (line, reason) of skips."""
+        Supplier.objects.bulk_create(
+            [obj for _, obj in rows],
+            update_conflicts=True,
+            unique_fields=['title'],
+            update_fields=['url'],
+        )
+        return []
+
+
+class StoreItemImporter:
+    """
+    Rows must have title, supplier (the supplier's title), supplier_url and
+    either price_usd or price_cents. Optional columns (description, image,
+    visible, active) keep their current values on existing items if a row
+    leaves them out.
+    """
+
+    required_fields = ('supplier', 'supplier_url', 'price_cents')
+    optional_fields = ('description', 'image', 'visible', 'active')
+
+    def __init__(self):
+        self.supplier_ids: dict[str, int] = {}
+
+    def build(self, row: dict) -> StoreItem:
+        if 'price_cents' in row:
+            price_cents = int(row['price_cents'])
+        else:
+            price_cents = money.usd_to_cents(row['price_usd'])
+
+        obj = StoreItem(
+            title=row['title'],
+            description=row.get('description', ''),
+            image=row.get('image') or None,
+            visible=parse_bool(row.get('visible', False)),
+            active=parse_bool(row.get('active', False)),
+            supplier_url=row['supplier_url'],
+            price_cents=price_cents,
+        )
+        # Empty descriptions and images are allowed in the database, only the
+        # admin forms insist on them.
+        obj.clean_fields(exclude=['supplier'] + [
+            field for field in ('description', 'image')
+            if not getattr(obj, field)
+        ])
+        obj.supplier_title = row['supplier']
+        obj.update_fields = self.required_fields + tuple(
+            field for field in self.optional_fields if field in row
+        )
+        return obj
+
+    def upsert(self, rows: list[tuple[int, StoreItem]]) -> list[tuple[int, str]]:
+        """Upserts (line, item) pairs. Returns (line, reason) of skips."""
+        self.resolve_suppliers({obj.supplier_title for _, obj in rows})
+
+        # NDJSON rows may have different keys, and a row must only overwrite
+        # the fields it has, so rows are upserted in groups of equal keys.
+        by_fields: dict[tuple[str, ...], list[StoreItem]] = {}
+        skipped = []
+        for line, obj in rows:
+            supplier_id = self.supplier_ids.get(obj.supplier_title)
+            if supplier_id is None:
+                skipped.append((line, f"unknown supplier {obj.supplier_title!r}"))
+                continue
+            obj.supplier_id = supplier_id
+            by_fields.setdefault(obj.update_fields, []).append(obj)
+
+        for update_fields, objs in by_fields.items():
+            StoreItem.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=['title'],
+                update_fields=list(update_fields),
+            )
+        return skipped
+
+    def resolve_suppliers(self, titles: Iterable[str]) -> None:
+        """Looks up the ids of suppliers not seen yet, in one query."""
+        missing = [t for t in titles if t not in self.supplier_ids]
+        if missing:
+            self.supplier_ids.update(
+                Supplier.objects
+                .filter(title__in=missing)
+                .values_list('title', 'id')
+            )
+
+
+def guess_format(path: str) -> str:
+    if path.endswith('.csv'):
+        return 'csv'
+    if path.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    raise CommandError(f"Cannot guess the format of {path}, pass --format")
+
+
+def open_input(path: str):
+    if path == '-':
+        # Not closed afterwards, unlike a file opened here.
+        return nullcontext(sys.stdin)
+    return open(path, newline='', encoding='utf-8')
+
+
+def read_rows(f, format: str) -> Iterator:
+    """Yields unparsed rows, so that a malformed line only skips that row."""
+    if format == 'csv':
+        yield from csv.DictReader(f)
+        return
+
+    for line in f:
+        if line.strip():
+            yield line
+
+
+def parse_row(raw, format: str) -> dict:
+    if format == 'csv':
+        return raw
+
+    row = json.loads(raw, parse_float=Decimal)
+    if not isinstance(row, dict):
+        raise TypeError(f"Expected a JSON object, got {type(row).__name__}")
+    return row
+
+
+def parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    value = str(value).strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f"Not a boolean: {value!r}")
@@ -1,9 +1,11 @@
 import logging
 from datetime import datetime
+from decimal import Decimal
 from urllib.parse import urljoin
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from gtf_order_api.profiling import ProfiledCommand
+from orders import money
 from orders.models import Order
 from requests import Session, RequestException
 
@@ -11,7 +13,7 @@ from requests import Session, RequestException
 logger = logging.getLogger(__name__)
 
 
-class Command(BaseCommand):
+class Command(ProfiledCommand):
     help = 'Processes incoming monero transactions.'
 
     def handle(self, *_, **__):
@@ -23,29 +25,49 @@ class Command(BaseCommand):
 
         with Session() as s:
             for order in orders:
-                expected = order.total_price()
+                expected = order.total_piconero()
 
                 self.stdout.write(f" - order: #{order.pk}")
                 self.stdout.write(f"   expected: {expected}")
-                self.stdout.write(f"   address: {order.address}")
+                self.stdout.write(f"   address: {order.xmr_address}")
 
                 try:
                     response = s.get(
-                        urljoin(base_url, f'/api/addresses/{order.address}')
+                        urljoin(base_url, f'/api/addresses/{order.xmr_address}'),
+                        params={'shard': order.xmr_wallet_shard},
                     )
                 except RequestException as e:
                     self.stderr.write(repr(e))
                     continue
 
-                data = response.json()
-                received = data['total_xmr']
-                txn_hash = data['txn_hash']
+                # One failed lookup must not stop the orders after it.
+                if not response.ok:
+                    logger.warning(
+                        "Address lookup for order #%s failed with %s",
+                        order.pk,
+                        response.status_code,
+                    )
+                    self.stderr.write(f"   lookup failed: {response.status_code}")
+                    continue
+
+                try:
+                    data = response.json(parse_float=Decimal)
+                except ValueError as e:
+                    self.stderr.write(repr(e))
+                    continue
+
+                if 'total_piconero' in data:
+                    received = data['total_piconero']
+                else:
+                    # Address services from before total_piconero existed
+                    received = money.xmr_to_piconero(data['total_xmr'])
+                txn_hash = data['transaction']
 
                 self.stdout.write(f"  received: {received}")
                 self.stdout.write(f"  txn_hash: {txn_hash}")
                 if received < expected:
                     self.stdout.write(f"   paid: no")
-                    break
+                    continue
 
                 self.stdout.write(f"  paid: yes")
                 order.mark_paid(txn_hash=txn_hash, date=datetime.now())
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from gtf_order_api.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = (
+        'Prints a token that, sent as the X-Profile header, profiles a request.'
+    )
+
+    def handle(self, *_, **__):
+        self.stdout.write(make_token())
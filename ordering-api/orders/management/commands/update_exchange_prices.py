@@ -1,6 +1,9 @@
 import requests
 import logging
-from django.core.management.base import BaseCommand
+from decimal import Decimal
+
+from gtf_order_api.profiling import ProfiledCommand
+from orders import money
 from orders.models import XMRExchangeRate
 
 
@@ -9,7 +12,7 @@ logger = logging.getLogger(__name__)
 API_URL = 'https://min-api.cryptocompare.com/data/price'
 
 
-class Command(BaseCommand):
+class Command(ProfiledCommand):
     help = 'Updates the USD/XMR exchange rate.'
 
     def handle(self, *_, **__):
@@ -19,10 +22,12 @@ class Command(BaseCommand):
             API_URL,
             params={'fsym': 'USD', 'tsyms': 'XMR'}
         )
-        data = response.json()
+        data = response.json(parse_float=Decimal)
         self.stderr.write(f"Got JSON response {repr(data)}")
 
         rate = data['XMR']
-        obj = XMRExchangeRate.objects.create(rate=rate)
+        obj = XMRExchangeRate.objects.create(
+            piconero_per_usd=money.xmr_to_piconero(rate)
+        )
         self.stderr.write(f"Created entry {obj}")
 
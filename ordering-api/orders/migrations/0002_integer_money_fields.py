@@ -0,0 +1,71 @@
+# Generated by Django 4.1.13 on 2026-10-19 04:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    # The decimal fields become nullable first, so that this can be migrated
+    # backwards: the removed columns are then re-added before being refilled.
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='xmr_per_usd_rate',
+            field=models.DecimalField(decimal_places=10, max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='processing_fees',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='ordereditem',
+            name='unit_price_usd',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='storeitem',
+            name='price_usd',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='xmrexchangerate',
+            name='rate',
+            field=models.DecimalField(decimal_places=10, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='piconero_per_usd',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='processing_fees_cents',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='ordereditem',
+            name='unit_price_cents',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='storeitem',
+            name='price_cents',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='xmrexchangerate',
+            name='piconero_per_usd',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='ordereditem',
+            name='order',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='orders.order'),
+        ),
+    ]
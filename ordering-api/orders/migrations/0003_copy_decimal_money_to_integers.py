@@ -0,0 +1,83 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations
+from django.db.migrations.exceptions import IrreversibleError
+
+
+# Conversions are kept here rather than imported from orders.money, so that
+# later changes to that module cannot change what this migration does.
+
+CENTS_PER_USD = 100
+PICONERO_PER_XMR = 10 ** 12
+
+# (model, decimal field, integer field, units, decimal_places, max_digits)
+CONVERSIONS = [
+    ('Order', 'xmr_per_usd_rate', 'piconero_per_usd', PICONERO_PER_XMR, 10, 10),
+    ('Order', 'processing_fees', 'processing_fees_cents', CENTS_PER_USD, 2, 10),
+    ('OrderedItem', 'unit_price_usd', 'unit_price_cents', CENTS_PER_USD, 2, 10),
+    ('StoreItem', 'price_usd', 'price_cents', CENTS_PER_USD, 2, 10),
+    ('XMRExchangeRate', 'rate', 'piconero_per_usd', PICONERO_PER_XMR, 10, 10),
+]
+
+BATCH_SIZE = 1000
+
+
+def to_units(value, units, _decimal_places, _max_digits):
+    return int((Decimal(value) * units).to_integral_value(ROUND_HALF_UP))
+
+
+def from_units(value, units, decimal_places, max_digits):
+    """
+    Converts back to a decimal, refusing values that the old decimal field
+    cannot hold exactly, such as rates of 1 XMR/USD or more.
+    """
+    result = Decimal(value) / units
+    exponent = result.as_tuple().exponent
+    n_integer_digits = len(str(abs(int(result)))) if abs(result) >= 1 else 0
+    if -exponent > decimal_places or n_integer_digits > max_digits - decimal_places:
+        raise IrreversibleError(
+            f"Cannot migrate {result} back into a decimal field with "
+            f"max_digits={max_digits} and decimal_places={decimal_places}"
+        )
+    return result
+
+
+def convert(apps, src_index, dst_index, func):
+    by_model = {}
+    for conversion in CONVERSIONS:
+        by_model.setdefault(conversion[0], []).append(conversion)
+
+    for model_name, conversions in by_model.items():
+        model = apps.get_model('orders', model_name)
+        fields = [c[dst_index] for c in conversions]
+
+        batch = []
+        for obj in model.objects.iterator(chunk_size=BATCH_SIZE):
+            for conversion in conversions:
+                value = getattr(obj, conversion[src_index])
+                setattr(obj, conversion[dst_index], func(value, *conversion[3:]))
+            batch.append(obj)
+            if len(batch) >= BATCH_SIZE:
+                model.objects.bulk_update(batch, fields)
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, fields)
+
+
+def forwards(apps, _):
+    convert(apps, src_index=1, dst_index=2, func=to_units)
+
+
+def backwards(apps, _):
+    convert(apps, src_index=2, dst_index=1, func=from_units)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_integer_money_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.1.13 on 2026-10-19 04:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_copy_decimal_money_to_integers'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='order',
+            name='processing_fees',
+        ),
+        migrations.RemoveField(
+            model_name='order',
+            name='xmr_per_usd_rate',
+        ),
+        migrations.RemoveField(
+            model_name='ordereditem',
+            name='unit_price_usd',
+        ),
+        migrations.RemoveField(
+            model_name='storeitem',
+            name='price_usd',
+        ),
+        migrations.RemoveField(
+            model_name='xmrexchangerate',
+            name='rate',
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='piconero_per_usd',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='processing_fees_cents',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='ordereditem',
+            name='unit_price_cents',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='storeitem',
+            name='price_cents',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='xmrexchangerate',
+            name='piconero_per_usd',
+            field=models.BigIntegerField(),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.1.13 on 2026-10-19 04:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_remove_decimal_money_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('email', models.EmailField(db_index=True, max_length=64)),
+                ('state', models.IntegerField()),
+                ('date_placed', models.DateTimeField()),
+                ('date_paid', models.DateTimeField(null=True)),
+                ('date_purchased', models.DateTimeField(null=True)),
+                ('date_arrived', models.DateTimeField(null=True)),
+                ('date_archived', models.DateTimeField(auto_now_add=True)),
+                ('piconero_per_usd', models.BigIntegerField()),
+                ('processing_fees_cents', models.BigIntegerField()),
+                ('items', models.JSONField(default=list)),
+            ],
+        ),
+    ]
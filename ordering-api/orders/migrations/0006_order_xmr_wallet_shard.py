@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-19 04:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_archivedorder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='xmr_wallet_shard',
+            field=models.CharField(max_length=64, null=True),
+        ),
+    ]
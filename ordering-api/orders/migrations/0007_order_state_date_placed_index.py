@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-19 04:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_xmr_wallet_shard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['state', 'date_placed'], name='orders_orde_state_0af9f3_idx'),
+        ),
+    ]
@@ -1,15 +1,19 @@
 from enum import IntEnum
 from datetime import datetime
+from decimal import Decimal
 import enum
 from typing import Optional
 
 from django.core.exceptions import ValidationError
-from django.db.models import Model
+from django.db.models import F, Index, Model, Sum
 from django.db.models.deletion import CASCADE, PROTECT
-from django.db.models.fields import BinaryField, BooleanField, CharField, DateField, DateTimeField, DecimalField, EmailField, IntegerField, TextField, URLField
+from django.db.models.fields import BigIntegerField, BinaryField, BooleanField, CharField, DateField, DateTimeField, EmailField, IntegerField, TextField, URLField
+from django.db.models.fields.json import JSONField
 from django.db.models.fields.related import ForeignKey
 from django.db.models.query import QuerySet
 
+from orders import money
+
 
 class XMRExchangeRate(Model):
     """
@@ -18,8 +22,13 @@ class XMRExchangeRate(Model):
     """
 
     date_updated = DateTimeField(auto_now_add=True, null=False)
-    rate = DecimalField(max_digits=10, decimal_places=10, null=False)
-    """Exchange rate, in XMR per USD."""
+    piconero_per_usd = BigIntegerField(null=False)
+    """Exchange rate, in piconero per USD."""
+
+    @property
+    def rate(self) -> Decimal:
+        """Exchange rate, in XMR per USD."""
+        return money.piconero_to_xmr(self.piconero_per_usd)
 
     def __str__(self):
         return f'{self.rate} XMR/USD @ {self.date_updated}'
@@ -52,7 +61,12 @@ class StoreItem(Model):
 
     supplier = ForeignKey(Supplier, on_delete=PROTECT)
     supplier_url = URLField(max_length=256)
-    price_usd = DecimalField(max_digits=10, decimal_places=2, null=False)
+    price_cents = BigIntegerField(null=False)
+    """Price in US cents."""
+
+    @property
+    def price_usd(self) -> Decimal:
+        return money.cents_to_usd(self.price_cents)
 
     def __str__(self):
         return f'StoreItem: {self.title} by {self.supplier}'
@@ -106,25 +120,48 @@ class Order(Model):
     soon as payment is received for privacy purposes.
     """
 
-    xmr_per_usd_rate = DecimalField(
-        max_digits=10,
-        decimal_places=10,
-        null=False
-    )
+    xmr_wallet_shard = CharField(max_length=64, null=True)
+    """
+    The create address service's name for the wallet holding xmr_address,
+    from the X-Wallet-Shard header. Passed back on lookups.
+    """
+
+    piconero_per_usd = BigIntegerField(null=False)
     """
     XMR exchange rate may change between orders. This freezes it for this order.
     """
 
-    processing_fees = DecimalField(max_digits=10, decimal_places=2, null=False)
-    """Additional fees applied to this order in USD."""
+    processing_fees_cents = BigIntegerField(null=False)
+    """Additional fees applied to this order in US cents."""
 
     items: QuerySet['OrderedItem']  # related field
 
+    class Meta:
+        indexes = [
+            # Finds orders to process by state, and old ones to archive.
+            Index(fields=['state', 'date_placed']),
+        ]
+
+    def total_cents(self) -> int:
+        """The total price of this order in US cents, including fees."""
+        items_cents = self.items.aggregate(
+            total=Sum(F('unit_price_cents') * F('quantity'))
+        )['total']
+        return (items_cents or 0) + self.processing_fees_cents
+
+    def total_piconero(self) -> int:
+        """The amount of XMR, in piconero, that must be paid for this order."""
+        return money.cents_to_piconero(
+            self.total_cents(),
+            self.piconero_per_usd,
+        )
+
     def mark_paid(self, txn_hash: str, date: datetime) -> None:
         self.state = Order.State.PAID
         self.xmr_txn_hash = txn_hash
         self.date_paid = date
         self.xmr_address = None
+        self.xmr_wallet_shard = None
 
     def mark_purchased(self, date: datetime) -> None:
         self.state = Order.State.PURCHASED
@@ -186,14 +223,77 @@ class Order(Model):
 
 class OrderedItem(Model):
     item = ForeignKey(StoreItem, on_delete=PROTECT)
-    order = ForeignKey(Order, on_delete=CASCADE)
+    order = ForeignKey(Order, on_delete=CASCADE, related_name='items')
     quantity = IntegerField()
-    unit_price_usd = DecimalField(max_digits=10, decimal_places=2, null=False)
+    unit_price_cents = BigIntegerField(null=False)
     """In case supplier prices change between orders."""
 
     def __str__(self):
+        unit_price = money.cents_to_usd(self.unit_price_cents)
         return (
-            f'OrderedItem: ${self.unit_price_usd} {self.item} x {self.quantity}'
+            f'OrderedItem: ${unit_price} {self.item} x {self.quantity}'
             f' of #{self.order.id}'
         )
 
+
+
+class ArchivedOrder(Model):
+    """
+    A COMPLETED or LOST order moved out of the Order table by the
+    archive_orders command, so that the tables hit by order placement and
+    payment processing stay small.
+
+    Keeps the order's original id. The ordered items are stored inline as a
+    list of {item, title, quantity, unit_price_cents} objects.
+    """
+
+    id = BigIntegerField(primary_key=True)
+    email = EmailField(max_length=64, null=False, db_index=True)
+    state = IntegerField(null=False)
+
+    date_placed = DateTimeField(null=False)
+    date_paid = DateTimeField(null=True)
+    date_purchased = DateTimeField(null=True)
+    date_arrived = DateTimeField(null=True)
+    date_archived = DateTimeField(auto_now_add=True)
+
+    piconero_per_usd = BigIntegerField(null=False)
+    processing_fees_cents = BigIntegerField(null=False)
+
+    items = JSONField(default=list)
+
+    @staticmethod
+    def from_order(order: Order) -> 'ArchivedOrder':
+        """Builds the archived copy of an order with its items prefetched."""
+        return ArchivedOrder(
+            id=order.pk,
+            email=order.email,
+            state=order.state,
+            date_placed=order.date_placed,
+            date_paid=order.date_paid,
+            date_purchased=order.date_purchased,
+            date_arrived=order.date_arrived,
+            piconero_per_usd=order.piconero_per_usd,
+            processing_fees_cents=order.processing_fees_cents,
+            items=[
+                {
+                    'item': ordered.item_id,
+                    'title': ordered.item.title,
+                    'quantity': ordered.quantity,
+                    'unit_price_cents': ordered.unit_price_cents,
+                }
+                for ordered in order.items.all()
+            ],
+        )
+
+    def total_cents(self) -> int:
+        """The total price of this order in US cents, including fees."""
+        return self.processing_fees_cents + sum(
+            item['unit_price_cents'] * item['quantity']
+            for item in self.items
+        )
+
+    def __str__(self):
+        return (
+            f'ArchivedOrder #{self.pk} state={self.state} buyer={self.email}'
+        )
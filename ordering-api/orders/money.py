@@ -0,0 +1,54 @@
+"""
+Conversions between human-readable amounts and the integer units that money
+is stored and computed in.
+
+USD amounts are stored in cents, XMR amounts in piconero (atomic units), and
+exchange rates in piconero per USD. Keeping everything integral makes pricing
+and the paid/unpaid comparison exact, both in Python and in SQL aggregates.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Union
+
+
+CENTS_PER_USD = 100
+PICONERO_PER_XMR = 10 ** 12
+
+Amount = Union[Decimal, int, str]
+"""
+A decimal amount. Floats are deliberately not accepted; parse JSON with
+``parse_float=Decimal`` instead.
+"""
+
+
+def _to_units(amount: Amount, units: int) -> int:
+    if isinstance(amount, float):
+        raise TypeError("Floats cannot represent money exactly, use Decimal")
+    return int((Decimal(amount) * units).to_integral_value(ROUND_HALF_UP))
+
+
+def usd_to_cents(usd: Amount) -> int:
+    """Converts USD to cents, rounding half a cent up."""
+    return _to_units(usd, CENTS_PER_USD)
+
+
+def cents_to_usd(cents: int) -> Decimal:
+    return Decimal(cents) / CENTS_PER_USD
+
+
+def xmr_to_piconero(xmr: Amount) -> int:
+    """Converts XMR to piconero, rounding half a piconero up."""
+    return _to_units(xmr, PICONERO_PER_XMR)
+
+
+def piconero_to_xmr(piconero: int) -> Decimal:
+    return Decimal(piconero) / PICONERO_PER_XMR
+
+
+def cents_to_piconero(cents: int, piconero_per_usd: int) -> int:
+    """
+    Converts a USD price to the XMR amount that must be paid for it.
+
+    Rounds up, so that the amount owed never falls short of the price.
+    """
+    return -(-cents * piconero_per_usd // CENTS_PER_USD)
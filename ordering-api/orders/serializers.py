@@ -1,4 +1,5 @@
 from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.fields import DecimalField
 from rest_framework.serializers import ModelSerializer
 
 from orders.models import Order, OrderedItem, StoreItem, XMRExchangeRate
@@ -15,7 +16,7 @@ class OrderedItemSerializer(ModelSerializer):
     class Meta:
         model = OrderedItem
         fields = ['item', 'quantity']
-        read_only_fields = ['unit_price_usd']
+        read_only_fields = ['unit_price_cents']
 
 
 class OrderSerializer(ModelSerializer):
@@ -25,14 +26,16 @@ class OrderSerializer(ModelSerializer):
         model = Order
         fields = ['email', 'mailing_address', 'items']
         read_only_fields = [
-            'xmr_per_usd_rate',
-            'processing_fees',
+            'piconero_per_usd',
+            'processing_fees_cents',
             'address',
             'date_placed'
         ]
 
 
 class StoreItemSerializer(ModelSerializer):
+    price_usd = DecimalField(max_digits=None, decimal_places=2, read_only=True)
+
     class Meta:
         model = StoreItem
         fields = [
@@ -42,14 +45,18 @@ class StoreItemSerializer(ModelSerializer):
             'active',
             'supplier_url',
             'price_usd',
+            'price_cents',
         ]
 
 
 class XMRExchangeRateSerializer(ModelSerializer):
+    rate = DecimalField(max_digits=None, decimal_places=12, read_only=True)
+
     class Meta:
         model = XMRExchangeRate
         fields = [
             'rate',
+            'piconero_per_usd',
             'date_updated',
         ]
 
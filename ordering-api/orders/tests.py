@@ -1,3 +1,396 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from gtf_order_api.profiling import ProfilingMiddleware, make_token
+from orders import money
+from orders.admin import CappedCountPaginator
+from orders.models import ArchivedOrder, EncryptKeys, Order, OrderedItem, StoreItem, Supplier, XMRExchangeRate
+
+
+class MoneyTests(SimpleTestCase):
+    def test_usd_to_cents_rounds_half_up(self):
+        self.assertEqual(money.usd_to_cents(Decimal('12.345')), 1235)
+        self.assertEqual(money.usd_to_cents('0.004'), 0)
+        self.assertEqual(money.usd_to_cents(3), 300)
+
+    def test_xmr_to_piconero(self):
+        self.assertEqual(money.xmr_to_piconero(Decimal('0.0061234567')), 6123456700)
+        self.assertEqual(money.xmr_to_piconero('1'), money.PICONERO_PER_XMR)
+
+    def test_floats_are_rejected(self):
+        with self.assertRaises(TypeError):
+            money.usd_to_cents(0.1)
+
+    def test_round_trip(self):
+        self.assertEqual(money.cents_to_usd(1235), Decimal('12.35'))
+        self.assertEqual(money.piconero_to_xmr(6123456700), Decimal('0.0061234567'))
+
+    def test_cents_to_piconero_rounds_up(self):
+        self.assertEqual(money.cents_to_piconero(100, 6123456700), 6123456700)
+        self.assertEqual(money.cents_to_piconero(1, 6123456701), 61234568)
+
+
+class OrderTotalTests(TestCase):
+    def test_total_includes_items_and_fees(self):
+        supplier = Supplier.objects.create(title='Supplier', url='https://example.com')
+        item = StoreItem.objects.create(
+            title='Item',
+            description='',
+            supplier=supplier,
+            supplier_url='https://example.com/item',
+            price_cents=1235,
+        )
+        now = timezone.now()
+        order = Order.objects.create(
+            email='buyer@example.com',
+            encrypt_key=EncryptKeys.objects.create(key=b'key'),
+            date_paid=now,
+            date_purchased=now,
+            date_arrived=now,
+            piconero_per_usd=6123456700,
+            processing_fees_cents=150,
+        )
+        OrderedItem.objects.create(
+            item=item,
+            order=order,
+            quantity=3,
+            unit_price_cents=1235,
+        )
+
+        self.assertEqual(order.total_cents(), 3855)
+        self.assertEqual(order.total_piconero(), 236059255785)
+
+
+class StoreInfoTests(TestCase):
+    def test_returns_decimal_and_integer_prices(self):
+        XMRExchangeRate.objects.create(piconero_per_usd=6123456700)
+        StoreItem.objects.create(
+            title='Item',
+            description='',
+            visible=True,
+            supplier=Supplier.objects.create(title='S', url='https://example.com'),
+            supplier_url='https://example.com/item',
+            price_cents=1235,
+        )
+
+        data = self.client.get('/api/info').json()
+
+        self.assertEqual(data['exchange']['rate'], '0.006123456700')
+        self.assertEqual(data['exchange']['piconero_per_usd'], 6123456700)
+        self.assertEqual(data['items'][0]['price_usd'], '12.35')
+        self.assertEqual(data['items'][0]['price_cents'], 1235)
+
+class ImportCatalogTests(TestCase):
+    def import_catalog(self, suffix: str, content: str, *args: str) -> str:
+        """Runs the command and returns what it wrote to stderr."""
+        stderr = StringIO()
+        with NamedTemporaryFile('w', suffix=suffix) as f:
+            f.write(content)
+            f.flush()
+            call_command(
+                'import_catalog',
+                f.name,
+                *args,
+                stdout=StringIO(),
+                stderr=stderr,
+            )
+        return stderr.getvalue()
+
+    def setUp(self):
+        Supplier.objects.create(title='Acme', url='https://acme.example.com')
+
+    def test_upserts_suppliers_and_items(self):
+        self.import_catalog(
+            '.csv',
+            'title,url\n'
+            'Acme,https://acme.example.org\n',
+            '--model=suppliers',
+        )
+        self.import_catalog(
+            '.ndjson',
+            '{"title": "Anvil", "supplier": "Acme", "supplier_url": "https://acme.example.com/anvil", "price_usd": 12.5, "visible": true}\n'
+            '{"title": "Rocket", "supplier": "Unknown", "supplier_url": "https://acme.example.com/rocket", "price_usd": 1}\n',
+        )
+        self.import_catalog(
+            '.csv',
+            'title,supplier,supplier_url,price_cents\n'
+            'Anvil,Acme,https://acme.example.com/anvil,1399\n',
+        )
+
+        item = StoreItem.objects.get()
+        self.assertEqual(item.title, 'Anvil')
+        self.assertEqual(item.supplier.url, 'https://acme.example.org')
+        self.assertEqual(item.price_cents, 1399)
+        self.assertTrue(item.visible)
+
+    def test_skips_malformed_rows(self):
+        stderr = self.import_catalog(
+            '.ndjson',
+            '{"title": "Anvil", "supplier": "Acme", "supplier_url": "https://acme.example.com/anvil", "price_usd": "abc"}\n'
+            '{"title": "Anvil", "supplier": "Acme", "supplier_url": "https://acme.example.com/anvil", "price_usd": null}\n'
+            '["not", "an", "object"]\n'
+            '{not json\n'
+            '{"title": "Rocket", "supplier": "Unknown", "supplier_url": "https://acme.example.com/rocket", "price_usd": 1}\n'
+            '{"title": "Bomb", "supplier": "Acme", "supplier_url": "https://acme.example.com/bomb", "price_usd": 5}\n',
+            '--chunk-size=2',
+        )
+
+        self.assertEqual(
+            [line.split(':')[0] for line in stderr.splitlines() if line.startswith('Skipping')],
+            [f'Skipping row {n}' for n in range(1, 6)],
+        )
+        self.assertEqual(StoreItem.objects.get().title, 'Bomb')
+
+    def test_last_row_wins_for_duplicate_titles(self):
+        self.import_catalog(
+            '.csv',
+            'title,supplier,supplier_url,price_cents\n'
+            'Anvil,Acme,https://acme.example.com/anvil,100\n'
+            'Anvil,Acme,https://acme.example.com/anvil,200\n',
+        )
+
+        self.assertEqual(StoreItem.objects.get().price_cents, 200)
+
+    def test_rows_only_update_their_own_fields(self):
+        StoreItem.objects.create(
+            title='B',
+            description='Old description',
+            supplier=Supplier.objects.get(),
+            supplier_url='https://acme.example.com/b',
+            price_cents=100,
+        )
+
+        self.import_catalog(
+            '.ndjson',
+            '{"title": "A", "supplier": "Acme", "supplier_url": "https://acme.example.com/a", "price_cents": 100, "description": "New"}\n'
+            '{"title": "B", "supplier": "Acme", "supplier_url": "https://acme.example.com/b", "price_cents": 200, "visible": true}\n',
+        )
+
+        a = StoreItem.objects.get(title='A')
+        b = StoreItem.objects.get(title='B')
+        self.assertEqual(a.description, 'New')
+        self.assertEqual(b.description, 'Old description')
+        self.assertTrue(b.visible)
+        self.assertEqual(b.price_cents, 200)
+
+    def test_reads_stdin_without_closing_it(self):
+        stdin = StringIO(
+            'title,supplier,supplier_url,price_cents\n'
+            'Anvil,Acme,https://acme.example.com/anvil,100\n'
+        )
+        with mock.patch('sys.stdin', stdin):
+            call_command(
+                'import_catalog',
+                '-',
+                '--format=csv',
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+
+        self.assertFalse(stdin.closed)
+        self.assertEqual(StoreItem.objects.get().title, 'Anvil')
+
+
+class ProfilingMiddlewareTests(SimpleTestCase):
+    def profiles_written(self, **headers) -> list[Path]:
+        middleware = ProfilingMiddleware(lambda _: HttpResponse())
+        with TemporaryDirectory() as tmp, override_settings(PROFILING_DIR=tmp):
+            middleware(RequestFactory().get('/api/info', **headers))
+            return list(Path(tmp).glob('*.pstats'))
+
+    def test_profiles_request_with_valid_token(self):
+        self.assertEqual(len(self.profiles_written(HTTP_X_PROFILE=make_token())), 1)
+
+    def test_ignores_invalid_token(self):
+        self.assertEqual(self.profiles_written(HTTP_X_PROFILE='forged'), [])
+
+    def test_does_not_profile_by_default(self):
+        self.assertEqual(self.profiles_written(), [])
+
+
+class ProfiledCommandTests(TestCase):
+    def test_profile_option_writes_pstats(self):
+        with TemporaryDirectory() as tmp, override_settings(PROFILING_DIR=tmp):
+            call_command(
+                'process_payments',
+                '--profile',
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+            profiles = [p.name for p in Path(tmp).glob('*.pstats')]
+
+        self.assertEqual(len(profiles), 1)
+        self.assertIn('command-process-payments', profiles[0])
+
+    @override_settings(PROFILING_SLOW_QUERY_MS=0)
+    def test_logs_slow_queries_with_project_stack(self):
+        with self.assertLogs('gtf_order_api.profiling', 'WARNING') as logs:
+            call_command('process_payments', stdout=StringIO(), stderr=StringIO())
+
+        message = logs.output[0]
+        self.assertIn('Slow query', message)
+        self.assertIn('FROM "orders_order"', message)
+        self.assertIn('orders/management/commands/process_payments.py', message)
+
+
+class ProcessPaymentsTests(TestCase):
+    def test_failed_lookup_does_not_stop_later_orders(self):
+        key = EncryptKeys.objects.create(key=b'key')
+        now = timezone.now()
+        for address in ('stale', 'fresh'):
+            Order.objects.create(
+                email='buyer@example.com',
+                encrypt_key=key,
+                date_paid=now,
+                date_purchased=now,
+                date_arrived=now,
+                xmr_address=address,
+                xmr_wallet_shard='host:18083/0',
+                piconero_per_usd=6123456700,
+                processing_fees_cents=150,
+            )
+
+        bad = mock.Mock(ok=False, status_code=400)
+        bad.json.side_effect = ValueError('not JSON')
+        good = mock.Mock(ok=True, status_code=200)
+        good.json.return_value = {'transaction': None, 'total_piconero': 0}
+        stdout = StringIO()
+
+        with mock.patch(
+            'orders.management.commands.process_payments.Session',
+        ) as session:
+            session.return_value.__enter__.return_value.get.side_effect = [bad, good]
+            call_command('process_payments', stdout=stdout, stderr=StringIO())
+
+        self.assertIn('address: fresh', stdout.getvalue())
+        self.assertIn('paid: no', stdout.getvalue())
+
+
+class ArchiveOrdersTests(TestCase):
+    def create_order(self, state: Order.State, age_days: int) -> Order:
+        now = timezone.now()
+        order = Order.objects.create(
+            email='buyer@example.com',
+            encrypt_key=self.key,
+            state=state,
+            date_paid=now,
+            date_purchased=now,
+            date_arrived=now,
+            piconero_per_usd=6123456700,
+            processing_fees_cents=150,
+        )
+        Order.objects.filter(pk=order.pk).update(
+            date_placed=now - timedelta(days=age_days)
+        )
+        OrderedItem.objects.create(
+            item=self.item,
+            order=order,
+            quantity=2,
+            unit_price_cents=1000,
+        )
+        return order
+
+    def setUp(self):
+        self.key = EncryptKeys.objects.create(key=b'key')
+        self.item = StoreItem.objects.create(
+            title='Item',
+            description='',
+            supplier=Supplier.objects.create(title='S', url='https://example.com'),
+            supplier_url='https://example.com/item',
+            price_cents=1000,
+        )
+
+    def test_archives_old_terminal_orders(self):
+        completed = self.create_order(Order.State.COMPLETED, age_days=100)
+        lost = self.create_order(Order.State.LOST, age_days=100)
+        recent = self.create_order(Order.State.COMPLETED, age_days=10)
+        open_ = self.create_order(Order.State.PAID, age_days=100)
+
+        call_command(
+            'archive_orders',
+            '--days=30',
+            '--chunk-size=1',
+            stdout=StringIO(),
+            stderr=StringIO(),
+        )
+
+        self.assertEqual(
+            set(Order.objects.values_list('pk', flat=True)),
+            {recent.pk, open_.pk},
+        )
+        self.assertEqual(OrderedItem.objects.count(), 2)
+
+        archived = ArchivedOrder.objects.get(pk=completed.pk)
+        self.assertEqual(archived.total_cents(), 2150)
+        self.assertEqual(archived.items[0]['title'], 'Item')
+        self.assertEqual(
+            set(ArchivedOrder.objects.filter(email='buyer@example.com')
+                .values_list('pk', flat=True)),
+            {completed.pk, lost.pk},
+        )
+
+    def test_dry_run_only_counts(self):
+        self.create_order(Order.State.COMPLETED, age_days=100)
+        stdout = StringIO()
+
+        call_command(
+            'archive_orders',
+            '--days=30',
+            '--dry-run',
+            stdout=stdout,
+            stderr=StringIO(),
+        )
+
+        self.assertIn('to_archive: 1', stdout.getvalue())
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertFalse(ArchivedOrder.objects.exists())
+
+    def test_admin_finds_archived_orders_by_id_or_email(self):
+        first = ArchivedOrder.from_order(
+            self.create_order(Order.State.COMPLETED, age_days=100)
+        )
+        first.save()
+        second = ArchivedOrder.from_order(
+            self.create_order(Order.State.LOST, age_days=100)
+        )
+        second.email = 'other@example.com'
+        second.save()
+
+        self.client.force_login(
+            User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        )
+        url = '/admin/orders/archivedorder/'
+
+        def found(query):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, {'q': query})
+            self.assertEqual(response.status_code, 200)
+            # Exact lookups that the primary key and email index can serve.
+            self.assertFalse(any('LIKE' in q['sql'] for q in queries))
+            return {o.pk for o in response.context['cl'].result_list}
+
+        self.assertEqual(found(str(first.pk)), {first.pk})
+        self.assertEqual(found('other@example.com'), {second.pk})
+        self.assertEqual(found('nobody@example.com'), set())
+        self.assertEqual(found('99999999999999999999'), set())
+        self.assertEqual(
+            self.client.get(f'{url}{first.pk}/change/').status_code,
+            200,
+        )
+        self.assertEqual(self.client.get(f'{url}add/').status_code, 403)
+
+        with mock.patch.object(CappedCountPaginator, 'max_count', 1):
+            response = self.client.get(url)
+        self.assertEqual(response.context['cl'].result_count, 1)